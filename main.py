@@ -1,7 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+import ahocorasick
 import re
 import os
 
@@ -22,16 +23,97 @@ class ScamRequest(BaseModel):
     text: str
     type: str  
 
+    @field_validator("type")
+    @classmethod
+    def normalize_type(cls, value: str) -> str:
+        # Lowercased once by pydantic-core so the router compares plain strings
+        return value.lower()
+
 class AnalyzeResponse(BaseModel):
     status: str
     risk_score: int
     threat_categories: list[str]
     flags_found: list[str]
 
+# Shared result for messages that trip no heuristic; returned as-is, never mutated
+CLEAN_RESULT = {
+    "status": "SAFE",
+    "risk_score": 0,
+    "threat_categories": [],
+    "flags_found": []
+}
+
+
+def build_keyword_automaton(keyword_groups: dict[str, list[str]]) -> ahocorasick.Automaton:
+    """
+    Compiles every keyword group into a single Aho-Corasick automaton.
+    Each keyword maps to the groups it belongs to, so one pass over the
+    text reports every group that was hit.
+    """
+    automaton = ahocorasick.Automaton()
+    for group, keywords in keyword_groups.items():
+        for kw in keywords:
+            _, groups = automaton.get(kw, (kw, ()))
+            automaton.add_word(kw, (kw, groups + (group,)))
+    automaton.make_automaton()
+    return automaton
+
+
+def match_keyword_groups(automaton: ahocorasick.Automaton, text: str) -> dict[str, set[str]]:
+    """
+    Returns each group that was hit, mapped to the distinct keywords found.
+    """
+    hits = {}
+    for _, (kw, groups) in automaton.iter(text):
+        for group in groups:
+            hits.setdefault(group, set()).add(kw)
+    return hits
 
-def deobfuscate_text(text: str) -> str:
-    
-    return re.sub(r'[^\w]', '', text).lower()
+
+# Email keyword groups, compiled once at import:
+EMAIL_KEYWORDS = build_keyword_automaton({
+    "govt": ["data entry", "ldc notification", "sarkari", "recruitment"],
+    "official_domain": [".gov.in", ".nic.in"],
+    "brand": ["ibm", "microsoft", "nasscom", "nsdc", "skill india", "iit bombay", "apple", "meta"],
+    "internship": ["internship", "shortlisted"],
+    "fee": ["fees: applicable", "registration fee", "tuition reduction", "scholarship code"],
+    "academic": ["mandatory participation", "academic credit requirements", "portal closes automatically"],
+    "security": ["your account will be deactivated", "potential fraud threats", "payment information update", "verify your details", "unusual activity"],
+    "refund": ["prize winnings", "exclusive deal", "eligible for a refund"],
+    "marathi": ["लॉटरी जिंकली", "खाते बंद", "पैसे पाठवा", "वीज बिल"],
+    "romance": ["refugee camp", "peacekeeping mission", "diplomatic courier", "leave processing", "fixed deposit account", "widow", "soulmate", "destined by god"],
+})
+
+# Greetings only count near the top of the message, so they are matched separately
+EMAIL_GREETINGS = build_keyword_automaton({
+    "greeting": ["dear customer", "dear user", "valued client", "attention required"],
+})
+
+
+# SMS keyword groups, compiled once at import:
+SMS_KEYWORDS = build_keyword_automaton({
+    "urgency": ["urgent", "update", "click", "verify"],
+    # 2024 Trend: India Post & e-Challan Traffic Fine smishing
+    "shipping": ["usps", "fedex", "ups", "package suspended", "reschedule delivery", "india post", "incomplete address", "customs duties"],
+    "toll": ["unpaid toll", "fastag blocked", "e-challan", "traffic fine", "unpaid penalty"],
+    "bank": ["reply with 6-digit code", "account locked", "unusual login detected", "first bank and trust"],
+    "pig_butchering": ["hi is this", "sorry wrong number", "let's be friends", "crypto tip"],
+    # Scammers messaging as family members or calling "beta" and claiming accidental transfer
+    "emergency": ["lost my phone", "this is my new number", "send money to", "need gift cards", "accidentally transferred", "return the money"],
+    "marathi": ["लाईट बिल", "kyc अपडेट", "बँक खाते"],
+    "romance": ["peacekeeping mission", "diplomatic courier", "satellite phone", "itunes gift cards", "leave processing", "widow"],
+    "job": ["remote task role", "rate hotels", "earn daily income", "online interview", "received your resume"],
+    "prize": ["amazon gift card", "loyalty gift", "claim your prize", "won a ", "rewarding our very best"],
+    "billing": ["electricity service", "disconnected due to non-payment", "process your refund", "subscription will auto-renew", "outstanding debt"],
+    "tax": ["irs notice", "outstanding tax", "student loan forgiveness"],
+    "short_urgency": ["act", "now", "verify", "immediate", "update"],
+})
+
+# Regexes, compiled once at import and shared by every request:
+# Only presence matters for URLs, so stop after the first character following the scheme
+URL_RE = re.compile(r'(?:https?://|www\.)\S')
+CRYPTO_WALLET_RE = re.compile(r'\b(bc1|[13])[a-zA-HJ-NP-Z0-9]{25,39}\b')
+APK_RE = re.compile(r'\.apk\b|download the app to your phone|install the application manually')
 
 
 # 3. The Email Engine (analyze_email):
@@ -41,7 +123,6 @@ def analyze_email(text: str) -> dict:
     flags_found = []
     threat_categories = []
     
-    clean_text = deobfuscate_text(text)
     lower_text = text.lower()
        
     letters_only = [char for char in text if char.isalpha()]
@@ -51,94 +132,71 @@ def analyze_email(text: str) -> dict:
             score += 15
             flags_found.append("High uppercase ratio (Panic formatting)")
             
+    # Single pass over the text for every keyword group
+    keyword_hits = match_keyword_groups(EMAIL_KEYWORDS, lower_text)
+            
     # Govt Job Bait (+40 pts):
-    govt_keywords = ["data entry", "ldc notification", "sarkari", "recruitment"]
-    has_govt_keywords = any(kw in lower_text for kw in govt_keywords)
-    has_official_domain = ".gov.in" in lower_text or ".nic.in" in lower_text
-    
-    if has_govt_keywords and not has_official_domain:
+    if "govt" in keyword_hits and "official_domain" not in keyword_hits:
         score += 40
         flags_found.append("Fake Govt Job without official domain")
-        if "Govt Job Bait" not in threat_categories:
-            threat_categories.append("Govt Job Bait")
+        threat_categories.append("Govt Job Bait")
             
     # Brand Stuffing (+30 pts):
-    huge_brands = ["ibm", "microsoft", "nasscom", "nsdc", "skill india", "iit bombay", "apple", "meta"]
-    brands_found = [brand for brand in huge_brands if brand in lower_text]
-    
-    if len(brands_found) >= 3:
+    if len(keyword_hits.get("brand", ())) >= 3:
         score += 30
         flags_found.append("Statistically improbable brand stuffing")
-        if "Brand Stuffing" not in threat_categories:
-            threat_categories.append("Brand Stuffing")
+        threat_categories.append("Brand Stuffing")
             
     # Pay-to-Play Internship (+50 pts):
-    internship_keywords = ["internship", "shortlisted"]
-    fee_keywords = ["fees: applicable", "registration fee", "tuition reduction", "scholarship code"]
-    
-    if any(kw in lower_text for kw in internship_keywords) and any(kw in lower_text for kw in fee_keywords):
+    if "internship" in keyword_hits and "fee" in keyword_hits:
         score += 50
         flags_found.append("Internship demanding upfront payment")
-        if "Pay-to-Play Internship" not in threat_categories:
-            threat_categories.append("Pay-to-Play Internship")
+        threat_categories.append("Pay-to-Play Internship")
             
     # Academic Coercion (+45 pts):
-    academic_keywords = ["mandatory participation", "academic credit requirements", "portal closes automatically"]
-    if any(kw in lower_text for kw in academic_keywords):
+    if "academic" in keyword_hits:
         score += 45
         flags_found.append("Aggressive academic coercion tactics detected")
-        if "Academic Coercion" not in threat_categories:
-            threat_categories.append("Academic Coercion")
+        threat_categories.append("Academic Coercion")
             
     # E-commerce Refund & Account Security Scams (+40 pts): 
-    security_bait = ["your account will be deactivated", "potential fraud threats", "payment information update", "verify your details", "unusual activity"]
-    refund_bait = ["prize winnings", "exclusive deal", "eligible for a refund"]
-    
-    if any(kw in lower_text for kw in security_bait):
+    if "security" in keyword_hits:
         score += 40
         flags_found.append("Fake Account Security / Deactivation threat")
-        if "Account Phishing" not in threat_categories:
-            threat_categories.append("Account Phishing")
+        threat_categories.append("Account Phishing")
             
-    if any(kw in lower_text for kw in refund_bait):
+    if "refund" in keyword_hits:
         score += 35
         flags_found.append("E-commerce Fake Refund / Prize Bait")
-        if "Refund Scam" not in threat_categories:
-            threat_categories.append("Refund Scam")
+        threat_categories.append("Refund Scam")
             
     # Marathi Regional Scams (+35 pts):
-    marathi_keywords = ["लॉटरी जिंकली", "खाते बंद", "पैसे पाठवा", "वीज बिल"]
-    if any(kw in lower_text for kw in marathi_keywords):
+    if "marathi" in keyword_hits:
         score += 35
         flags_found.append("Regional Marathi scam phrases detected")
-        if "Marathi Regional Scams" not in threat_categories:
-            threat_categories.append("Marathi Regional Scams")
+        threat_categories.append("Marathi Regional Scams")
             
     # Generic Phishing Greetings (+20 pts):
-    generic_greetings = ["dear customer", "dear user", "valued client", "attention required"]
-    if any(text.lower().startswith(kw) or (kw in lower_text[:50]) for kw in generic_greetings):
+    if match_keyword_groups(EMAIL_GREETINGS, lower_text[:50]):
         score += 20
         flags_found.append("Generic greeting used in official context (Phishing Marker)")
-        if "Authentication/Identity Phishing" not in threat_categories:
-            threat_categories.append("Authentication/Identity Phishing")
+        threat_categories.append("Authentication/Identity Phishing")
             
     # Financial String Recognition (Crypto / IBAN / Account Numbers) (+30 pts):
-    crypto_pattern = r'\b(bc1|[13])[a-zA-HJ-NP-Z0-9]{25,39}\b'  
-    if re.search(crypto_pattern, text):
+    if CRYPTO_WALLET_RE.search(text):
         score += 30
         flags_found.append("Cryptocurrency wallet string detected in text")
-        if "Cryptocurrency Fraud" not in threat_categories:
-            threat_categories.append("Cryptocurrency Fraud")
+        threat_categories.append("Cryptocurrency Fraud")
             
     # Romance & Advance Fee Fraud (+50 pts)
-    romance_keywords = ["refugee camp", "peacekeeping mission", "diplomatic courier", "leave processing", "fixed deposit account", "widow", "soulmate", "destined by god"]
-    if any(kw in lower_text for kw in romance_keywords):
+    if "romance" in keyword_hits:
         score += 50
         flags_found.append("Advanced Fee / Romance / Military Scam format detected")
-        if "Advance Fee Fraud" not in threat_categories:
-            threat_categories.append("Advance Fee Fraud")
+        threat_categories.append("Advance Fee Fraud")
             
     # Resolution State
+    if score == 0:
+        return CLEAN_RESULT
     score = min(score, 100)
     
     if score >= 60:
@@ -166,131 +224,103 @@ def analyze_sms(text: str) -> dict:
     threat_categories = []
     
     # Generate our structural states
-    clean_text = deobfuscate_text(text)
     lower_text = text.lower()
     
+    # Single pass over the text for every keyword group
+    keyword_hits = match_keyword_groups(SMS_KEYWORDS, lower_text)
+    
     # 4.1 Short-Link & Urgency (+40 pts)
-    url_pattern = r'(https?://|www\.)\S+'
-    has_url = bool(re.search(url_pattern, text))
-    urgency_keywords = ["urgent", "update", "click", "verify"]
+    has_url = bool(URL_RE.search(text))
     
-    if has_url and any(kw in lower_text for kw in urgency_keywords):
+    if has_url and "urgency" in keyword_hits:
         score += 40
         flags_found.append("Suspicious short-link combined with urgency markers")
-        if "Short-Link & Urgency" not in threat_categories:
-            threat_categories.append("Short-Link & Urgency")
+        threat_categories.append("Short-Link & Urgency")
             
     # Package & Toll Friction (+45 pts):
-    # 2024 Trend: India Post & e-Challan Traffic Fine smishing
-    shipping_keywords = ["usps", "fedex", "ups", "package suspended", "reschedule delivery", "india post", "incomplete address", "customs duties"]
-    toll_keywords = ["unpaid toll", "fastag blocked", "e-challan", "traffic fine", "unpaid penalty"]
-    
-    if any(kw in lower_text for kw in shipping_keywords):
+    if "shipping" in keyword_hits:
         score += 45
         flags_found.append("Postal / Logistics friction scam pattern detected")
-        if "Package Delivery Scam" not in threat_categories:
-            threat_categories.append("Package Delivery Scam")
+        threat_categories.append("Package Delivery Scam")
             
-    if any(kw in lower_text for kw in toll_keywords):
+    if "toll" in keyword_hits:
         score += 45
         flags_found.append("Fake Toll / Traffic Fine (e-Challan) warning")
-        if "Govt Fine Scam" not in threat_categories:
-            threat_categories.append("Govt Fine Scam")
+        threat_categories.append("Govt Fine Scam")
             
     # OTP & Bank Panic (+50 pts)
-    bank_keywords = ["reply with 6-digit code", "account locked", "unusual login detected", "first bank and trust"]
-    if any(kw in lower_text for kw in bank_keywords):
+    if "bank" in keyword_hits:
         score += 50
         flags_found.append("Financial panic / OTP interception attempt detected")
-        if "OTP & Bank Panic" not in threat_categories:
-            threat_categories.append("OTP & Bank Panic")
+        threat_categories.append("OTP & Bank Panic")
             
     # Pig Butchering / Wrong Number (+35 pts)
-    pig_butchering_keywords = ["hi is this", "sorry wrong number", "let's be friends", "crypto tip"]
-    if any(kw in lower_text for kw in pig_butchering_keywords):
+    if "pig_butchering" in keyword_hits:
         score += 35
         flags_found.append("Social engineering / Pig butchering opener detected")
-        if "Pig Butchering / Wrong Number" not in threat_categories:
-            threat_categories.append("Pig Butchering / Wrong Number")
+        threat_categories.append("Pig Butchering / Wrong Number")
             
     # Boss/Family Emergency & "Papa" Scams (+40 pts)
-    # Scammers messaging as family members or calling "beta" and claiming accidental transfer
-    emergency_keywords = ["lost my phone", "this is my new number", "send money to", "need gift cards", "accidentally transferred", "return the money"]
-    if any(kw in lower_text for kw in emergency_keywords):
+    if "emergency" in keyword_hits:
         score += 40
         flags_found.append("Impersonation / Family Emergency contact scam detected")
-        if "Family Emergency Threat" not in threat_categories:
-            threat_categories.append("Family Emergency Threat")
+        threat_categories.append("Family Emergency Threat")
             
     # Marathi SMS (+35 pts)
-    marathi_sms_keywords = ["लाईट बिल", "kyc अपडेट", "बँक खाते"]
-    if any(kw in lower_text for kw in marathi_sms_keywords):
+    if "marathi" in keyword_hits:
         score += 35
         flags_found.append("Regional Marathi SMS scam phrases detected")
-        if "Marathi SMS Scams" not in threat_categories:
-            threat_categories.append("Marathi SMS Scams")
+        threat_categories.append("Marathi SMS Scams")
             
     #Romance & Military Impersonation (+45 pts)
-    romance_keywords = ["peacekeeping mission", "diplomatic courier", "satellite phone", "itunes gift cards", "leave processing", "widow"]
-    if any(kw in lower_text for kw in romance_keywords):
+    if "romance" in keyword_hits:
         score += 45
         flags_found.append("Romance / Military Impersonation scam detected")
-        if "Romance / Military Scam" not in threat_categories:
-            threat_categories.append("Romance / Military Scam")
+        threat_categories.append("Romance / Military Scam")
 
     # Fake Job & Task Scams (+45 pts)
-    job_keywords = ["remote task role", "rate hotels", "earn daily income", "online interview", "received your resume"]
-    if any(kw in lower_text for kw in job_keywords):
+    if "job" in keyword_hits:
         score += 45
         flags_found.append("Fake Recruiter / Task Scam detected")
-        if "Fake Job Offer" not in threat_categories:
-            threat_categories.append("Fake Job Offer")
+        threat_categories.append("Fake Job Offer")
             
     # Prize & Giveaway Scams (+40 pts)
-    prize_keywords = ["amazon gift card", "loyalty gift", "claim your prize", "won a ", "rewarding our very best"]
-    if any(kw in lower_text for kw in prize_keywords):
+    if "prize" in keyword_hits:
         score += 40
         flags_found.append("Extremely common Prize / Giveaway bait detected")
-        if "Prize Scam" not in threat_categories:
-            threat_categories.append("Prize Scam")
+        threat_categories.append("Prize Scam")
             
     # Fake Billing, Utilities & Subscriptions (+40 pts)
-    billing_keywords = ["electricity service", "disconnected due to non-payment", "process your refund", "subscription will auto-renew", "outstanding debt"]
-    if any(kw in lower_text for kw in billing_keywords):
+    if "billing" in keyword_hits:
         score += 40
         flags_found.append("Fake Billing / Utility disconnection threat")
-        if "Fake Billing/Collections" not in threat_categories:
-            threat_categories.append("Fake Billing/Collections")
+        threat_categories.append("Fake Billing/Collections")
             
     # Govt & Tax Impersonation (+50 pts)
-    tax_keywords = ["irs notice", "outstanding tax", "student loan forgiveness"]
-    if any(kw in lower_text for kw in tax_keywords):
+    if "tax" in keyword_hits:
         score += 50
         flags_found.append("Government Identity Impersonation (IRS/Loans)")
-        if "Govt Impersonation" not in threat_categories:
-            threat_categories.append("Govt Impersonation")
+        threat_categories.append("Govt Impersonation")
 
     # Contextual Mismatch: Urgency without specifics (+35 pts)
     # Modern SMS scams say "Action required" but give no context before the link
-    words = text.split()
-    if len(words) < 15 and has_url:
-        short_urgency = ["act", "now", "verify", "immediate", "update"]
-        if any(kw in lower_text for kw in short_urgency):
+    if has_url and "short_urgency" in keyword_hits:
+        # maxsplit caps the token list at 15 entries however long the message is
+        if len(text.split(maxsplit=14)) < 15:
             score += 35
             flags_found.append("Extremely high urgency relative to message length (Contextual Mismatch)")
-            if "Phishing Link Dissemination" not in threat_categories:
-                threat_categories.append("Phishing Link Dissemination")
+            threat_categories.append("Phishing Link Dissemination")
 
     # APK / Malware Sideloading Attempts (+60 pts)
     # Huge threat vector in India: Links prompting to download .apk files directly
-    apk_pattern = r'\.apk\b|download the app to your phone|install the application manually'
-    if re.search(apk_pattern, lower_text):
+    if APK_RE.search(lower_text):
         score += 60
         flags_found.append("Malware / APK Sideloading attempt detected")
-        if "Malware Dissemination" not in threat_categories:
-            threat_categories.append("Malware Dissemination")
+        threat_categories.append("Malware Dissemination")
 
     # Resolution State
+    if score == 0:
+        return CLEAN_RESULT
     score = min(score, 100)
     
     if score >= 60:
@@ -309,27 +339,38 @@ def analyze_sms(text: str) -> dict:
 
 
 # Router Endpoint
+# Unknown request types fall back to the SMS engine
+ANALYZERS = {
+    "email": analyze_email,
+    "sms": analyze_sms,
+}
+
 @app.post("/analyze", response_model=AnalyzeResponse)
 def analyze_endpoint(request: ScamRequest):
     
-    if request.type.lower() == "email":
-        result = analyze_email(request.text)
-    elif request.type.lower() == "sms":
-        result = analyze_sms(request.text)
-    else:
-       
-        result = analyze_sms(request.text)
+    result = ANALYZERS.get(request.type, analyze_sms)(request.text)
         
-    return AnalyzeResponse(**result)
+    # response_model validates and serializes the dict once; no second model build
+    return result
 
-@app.get("/", response_class=HTMLResponse)
-def read_root():
+def load_dashboard_html() -> bytes:
     """
-    Frontend routing logic. 
-    Serves the premium dashboard directly from root.
+    Reads the dashboard once at startup so GET / never touches the disk.
+    Kept as raw bytes so it is never re-encoded per request.
     """
     html_path = os.path.join(os.path.dirname(__file__), "index2.html")
     if os.path.exists(html_path):
-        with open(html_path, "r", encoding="utf-8") as f:
+        with open(html_path, "rb") as f:
             return f.read()
-    return "<h1>Error: index2.html missing from the server root.</h1>"
\ No newline at end of file
+    return b"<h1>Error: index2.html missing from the server root.</h1>"
+
+# Built once and reused; Starlette only reads the body and headers when sending
+DASHBOARD_RESPONSE = HTMLResponse(load_dashboard_html())
+
+@app.get("/", response_class=HTMLResponse)
+async def read_root():
+    """
+    Frontend routing logic. 
+    Serves the premium dashboard directly from root.
+    """
+    return DASHBOARD_RESPONSE
\ No newline at end of file